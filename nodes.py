@@ -5,13 +5,29 @@ Cicada AI Nodes for ComfyUI
 包含：对口型、声音克隆、视频播放器
 """
 
+import io
 import os
+import re
+import random
 import json
 import time
+import atexit
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import folder_paths
 import mimetypes
+import tempfile
 import hashlib
+import importlib
+import mmap
+import struct
+from collections import OrderedDict
+import numpy as np
+import torch  # ComfyUI 环境必定自带
 
 try:
     import cv2
@@ -27,6 +43,44 @@ except ImportError:
     MUTAGEN_AVAILABLE = False
     # 仅在真正需要时才提示（在使用时检测）
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    # 可选加速，未安装时回退到标准库 json
+
+# 音频读写后端（首次使用时导入，结果含导入失败均缓存，之后不再重复 import）
+_UNSET = object()
+_OPTIONAL_MODULES = {}  # {模块名: 模块对象 或 None（不可用）}
+
+
+def _optional_import(name):
+    """导入可选依赖，不可用时返回 None；每个模块进程内只尝试一次"""
+    module = _OPTIONAL_MODULES.get(name, _UNSET)
+    if module is _UNSET:
+        try:
+            module = importlib.import_module(name)
+        except Exception:
+            module = None
+        _OPTIONAL_MODULES[name] = module
+    return module
+
+
+def _scipy_wavfile():
+    """scipy.io.wavfile（仅 wav），不可用时返回 None"""
+    return _optional_import("scipy.io.wavfile")
+
+
+def _soundfile():
+    """soundfile（wav/flac/ogg 等），不可用时返回 None"""
+    return _optional_import("soundfile")
+
+
+def _torchaudio():
+    """torchaudio（需 sox/soundfile/ffmpeg 后端），不可用时返回 None"""
+    return _optional_import("torchaudio")
+
 
 # ==================== 统一鉴权管理 ====================
 
@@ -34,6 +88,80 @@ PLUGIN_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_FILE = os.path.join(PLUGIN_DIR, "config.json")
 TOKEN_CACHE_FILE = os.path.join(PLUGIN_DIR, ".cache", "token.json")
 VOICE_CLONE_CACHE_FILE = os.path.join(PLUGIN_DIR, ".cache", "voice_clone.json")
+VOICE_CLONE_CACHE_LOG_FILE = VOICE_CLONE_CACHE_FILE + ".log"
+
+
+def _json_dumps(obj, indent=True):
+    """序列化为 UTF-8 JSON bytes（优先使用 orjson）；indent=False 时输出单行"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    if indent:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(data):
+    """解析 JSON bytes/str（优先使用 orjson）"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _atomic_write_json(path, obj):
+    """
+    原子写入 JSON 文件
+    先写入同目录临时文件再 os.replace 替换，写入中途崩溃不会损坏原文件
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = _json_dumps(obj)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        # 文件对象的 write 会循环写完全部数据（os.write 可能只写入一部分）
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class _DeferredWriter:
+    """
+    延迟合并写盘
+    短时间内多次 schedule() 只会触发一次 write_fn，进程退出时自动补写未落盘的数据
+    """
+
+    def __init__(self, write_fn, delay=0.5):
+        self._write_fn = write_fn
+        self._delay = delay
+        self._dirty = False
+        self._timer = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def schedule(self):
+        """标记数据已修改，delay 秒内无新修改则写盘"""
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self._delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """立即写盘（无修改时跳过）"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+        self._write_fn()
 
 
 class CicadaAuth:
@@ -49,9 +177,14 @@ class CicadaAuth:
     """
     _config = None          # 用户凭证缓存
     _config_hash = None     # 凭证指纹（用于检测变更）
+    _config_mtime = 0       # 上次加载时 config.json 的修改时间（ns）
     _token = None           # access_token 字符串
     _token_expire = 0       # token 过期时间戳
     _token_config_hash = None  # 生成当前 token 时的凭证指纹
+    _persisted_state = None    # 最近一次写入/读取磁盘的 token 状态
+    _token_writer = _DeferredWriter(lambda: CicadaAuth._write_token_cache())
+    _lock = threading.Lock()  # 串行化 token 刷新，避免并发节点重复请求鉴权接口
+    TOKEN_MAX_TTL = 30 * 86400   # expire_in 按剩余秒数解释时的上限（超出视为异常值）
 
     # ---------- 用户凭证（config.json） ----------
 
@@ -63,18 +196,24 @@ class CicadaAuth:
     @classmethod
     def _load_config(cls):
         """
-        从磁盘加载用户凭证配置（每次都重新读取，确保能检测到变更）
+        从磁盘加载用户凭证配置
+        按文件修改时间判断是否需要重新读取：未变更时仅一次 stat，变更后立即生效
         """
-        if not os.path.exists(CONFIG_FILE):
+        try:
+            st = os.stat(CONFIG_FILE)
+        except FileNotFoundError:
             raise FileNotFoundError(
                 f"❌ 未找到配置文件: {CONFIG_FILE}\n"
                 f"请复制 config.example.json 为 config.json 并填入你的 app_id 和 secret_key\n"
                 f"获取地址: https://www.chanjing.cc/platform/api_keys"
             )
+        if cls._config is not None and st.st_mtime_ns == cls._config_mtime:
+            return cls._config
+
         try:
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-        except json.JSONDecodeError as e:
+            with open(CONFIG_FILE, 'rb') as f:
+                config = _json_loads(f.read())
+        except ValueError as e:
             raise Exception(f"❌ config.json 格式错误: {e}")
 
         app_id = config.get("app_id", "").strip()
@@ -93,6 +232,7 @@ class CicadaAuth:
 
         cls._config = {"app_id": app_id, "secret_key": secret_key}
         cls._config_hash = cls._compute_config_hash(app_id, secret_key)
+        cls._config_mtime = st.st_mtime_ns
         return cls._config
 
     @classmethod
@@ -109,28 +249,40 @@ class CicadaAuth:
         """从磁盘加载 token 缓存"""
         try:
             if os.path.exists(TOKEN_CACHE_FILE):
-                with open(TOKEN_CACHE_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(TOKEN_CACHE_FILE, 'rb') as f:
+                    data = _json_loads(f.read())
                     cls._token = data.get("access_token")
                     cls._token_expire = data.get("expire_time", 0)
                     cls._token_config_hash = data.get("config_hash")
+                cls._persisted_state = cls._token_state()
         except Exception:
             cls._token = None
             cls._token_expire = 0
             cls._token_config_hash = None
 
+    @classmethod
+    def _token_state(cls):
+        """当前 token 状态摘要（过期时间精确到分钟），用于判断是否需要写盘"""
+        return (cls._token, int(cls._token_expire) // 60, cls._token_config_hash)
+
     @classmethod
     def _save_token_cache(cls):
-        """将 token 缓存写入磁盘（连同凭证指纹一起保存）"""
+        """标记 token 缓存待写盘（合并短时间内的多次刷新；与磁盘内容一致时跳过）"""
+        if cls._token_state() == cls._persisted_state:
+            return
+        cls._token_writer.schedule()
+
+    @classmethod
+    def _write_token_cache(cls):
+        """将 token 缓存写入磁盘（连同凭证指纹一起保存，写临时文件后原子替换）"""
+        state = cls._token_state()
         try:
-            cache_dir = os.path.dirname(TOKEN_CACHE_FILE)
-            os.makedirs(cache_dir, exist_ok=True)
-            with open(TOKEN_CACHE_FILE, 'w', encoding='utf-8') as f:
-                json.dump({
-                    "access_token": cls._token,
-                    "expire_time": cls._token_expire,
-                    "config_hash": cls._config_hash,
-                }, f, indent=2)
+            _atomic_write_json(TOKEN_CACHE_FILE, {
+                "access_token": cls._token,
+                "expire_time": cls._token_expire,
+                "config_hash": cls._config_hash,
+            })
+            cls._persisted_state = state
         except Exception as e:
             print(f"⚠️  保存 token 缓存失败: {e}")
 
@@ -141,6 +293,25 @@ class CicadaAuth:
         """检测凭证是否发生变更（对比当前 config.json 与 token 关联的凭证指纹）"""
         return cls._config_hash != cls._token_config_hash
 
+    @staticmethod
+    def _parse_token_expire(expire_in):
+        """
+        解析接口返回的过期信息为过期时间戳
+        expire_in 可能是过期时间戳或剩余秒数；缺失/异常时按 24h 有效期处理
+        只有合理的时长（< TOKEN_MAX_TTL）才按剩余秒数解释：已过去的绝对时间戳
+        （本地时钟超前或服务端值陈旧）不能被当成秒数，否则 token 会被视为几十年有效并写入缓存
+        """
+        now = time.time()
+        try:
+            expire_in = float(expire_in)
+        except (TypeError, ValueError):
+            return now + 24 * 3600
+        if expire_in > now:
+            return expire_in            # 绝对时间戳
+        if 0 < expire_in < CicadaAuth.TOKEN_MAX_TTL:
+            return now + expire_in      # 剩余秒数
+        return now + 24 * 3600
+
     @classmethod
     def _refresh_token(cls):
         """向蝉镜 API 请求新 token"""
@@ -155,7 +326,7 @@ class CicadaAuth:
         )
         data = result.get("data", {})
         cls._token = data.get("access_token")
-        cls._token_expire = time.time() + 24 * 3600  # 24h 有效期
+        cls._token_expire = cls._parse_token_expire(data.get("expire_in"))
         cls._token_config_hash = cls._config_hash    # 记录生成此 token 的凭证指纹
 
         if not cls._token:
@@ -168,53 +339,46 @@ class CicadaAuth:
     def get_token(cls):
         """
         获取 AccessToken（所有节点统一调用此方法）
-        - 每次调用都重新读取 config.json，检测凭证是否变更
+        - 每次调用都检查 config.json 是否修改，检测凭证是否变更
         - 凭证变更 → 自动作废旧 Token，重新获取
         - 凭证未变 → 优先使用内存/磁盘缓存，过期前 5 分钟自动刷新
         """
         now = time.time()
 
-        # 0. 每次都重新读取 config.json，确保能检测到凭证变更
+        # 0. 检查 config.json（文件修改后重新读取），确保能检测到凭证变更
         cls._load_config()
+        changed = cls._config_changed()
 
-        # 1. 检测凭证是否变更 → 变更则作废旧 token
-        if cls._config_changed():
-            if cls._token:
-                print("🔄 检测到凭证变更，旧 Token 已作废，正在重新获取...")
-            cls._token = None
-            cls._token_expire = 0
-            cls._token_config_hash = None
+        # 1. 内存中无 token 或凭证已变更 → 尝试从磁盘恢复（首次调用或进程重启后）
+        if changed or cls._token is None:
+            if changed and cls._token:
+                print("🔄 检测到凭证变更，旧 Token 已作废")
+            cls._load_token_cache()
+            changed = cls._config_changed()  # 磁盘缓存也要验证凭证指纹
+            if cls._token and not changed and now < cls._token_expire - 300:
+                print("✅ 使用缓存的 AccessToken")
 
-        # 2. 内存缓存有效
-        if cls._token and now < cls._token_expire - 300:
+        # 2. 缓存有效（凭证未变且距过期超过 5 分钟）
+        if cls._token and not changed and now < cls._token_expire - 300:
             return cls._token
 
-        # 3. 尝试从磁盘恢复（首次调用或进程重启后）
-        if cls._token is None:
-            cls._load_token_cache()
-            # 磁盘缓存也要验证凭证指纹
-            if cls._token and now < cls._token_expire - 300 and not cls._config_changed():
-                print("✅ 使用缓存的 AccessToken")
+        # 3. 需要刷新（加锁；等锁期间其他线程可能已刷新完成，需再次检查）
+        with cls._lock:
+            if cls._token and not cls._config_changed() and time.time() < cls._token_expire - 300:
                 return cls._token
-            # 磁盘缓存的凭证指纹不匹配，作废
-            if cls._config_changed():
-                print("🔄 磁盘缓存的 Token 与当前凭证不匹配，将重新获取")
-                cls._token = None
-                cls._token_expire = 0
-                cls._token_config_hash = None
-
-        # 4. 需要刷新
-        cls._refresh_token()
-        return cls._token
+            cls._refresh_token()
+            return cls._token
 
     @classmethod
     def reset(cls):
         """重置鉴权状态（用于凭证变更后强制刷新）"""
         cls._config = None
         cls._config_hash = None
+        cls._config_mtime = 0
         cls._token = None
         cls._token_expire = 0
         cls._token_config_hash = None
+        _clear_access_token_cache()
 
 
 # ==================== 声音克隆缓存 ====================
@@ -223,38 +387,99 @@ class VoiceCloneCache:
     """
     声音克隆结果缓存
     
-    缓存 key = md5(音频文件内容) + model_type
+    缓存 key = blake2b(音频文件内容) + model_type
     缓存 value = voice_id（蝉镜平台返回的克隆声音 ID）
     
     同一个音频文件 + 同一个模型，克隆结果相同，无需重复克隆。
+
+    持久化方式：快照 + 追加日志
+    - 快照 voice_clone.json: {"version": 2, "entries": {key: {...}}}
+      version 与 CACHE_VERSION 不一致时（如指纹算法由 MD5 改为 BLAKE2b）整体作废。
+    - 日志 voice_clone.json.log: 每行一条 {"op": "put"/"del", "key": ..., "entry": {...}}
+      put/remove 只追加一行；加载时先读快照再重放日志。
+    - 日志条数超过存活条目 2 倍时，合并写出新快照并清空日志。
     """
+    CACHE_VERSION = 2
+    COMPACT_MIN_LOG_ENTRIES = 32  # 日志条数低于此值时不压缩
     _cache = None  # 内存缓存
+    _log_entries = 0  # 当前日志中的记录条数
+    _writer = _DeferredWriter(lambda: VoiceCloneCache._compact())
+    _lock = threading.Lock()  # 保护 _cache 及缓存文件的并发读写
 
     @classmethod
     def _load(cls):
-        """从磁盘加载缓存"""
+        """从磁盘加载缓存（快照 + 重放日志）"""
         if cls._cache is not None:
             return
-        try:
-            if os.path.exists(VOICE_CLONE_CACHE_FILE):
-                with open(VOICE_CLONE_CACHE_FILE, 'r', encoding='utf-8') as f:
-                    cls._cache = json.load(f)
-            else:
-                cls._cache = {}
-        except Exception:
-            cls._cache = {}
+        with cls._lock:
+            if cls._cache is not None:
+                return
+            entries = {}
+            log_entries = 0
+            needs_compact = False
+            try:
+                if os.path.exists(VOICE_CLONE_CACHE_FILE):
+                    with open(VOICE_CLONE_CACHE_FILE, 'rb') as f:
+                        data = _json_loads(f.read())
+                    if isinstance(data, dict) and data.get("version") == cls.CACHE_VERSION:
+                        entries = data.get("entries", {})
+                    # 否则为旧版本缓存（key 格式不同），直接作废
+
+                if os.path.exists(VOICE_CLONE_CACHE_LOG_FILE):
+                    with open(VOICE_CLONE_CACHE_LOG_FILE, 'rb') as f:
+                        for line in f:
+                            try:
+                                record = _json_loads(line)
+                                if record["op"] == "put":
+                                    entries[record["key"]] = record["entry"]
+                                elif record["op"] == "del":
+                                    entries.pop(record["key"], None)
+                            except Exception:
+                                # 写入中断留下的残行：跳过，加载完成后立即压缩，避免后续追加接在残行后面
+                                needs_compact = True
+                                continue
+                            log_entries += 1
+            except Exception:
+                entries = {}
+            cls._cache = entries
+            cls._log_entries = log_entries
+        if needs_compact:
+            cls._compact()
 
     @classmethod
-    def _save(cls):
-        """持久化缓存到磁盘"""
+    def _append_log(cls, record):
+        """追加一条操作记录到日志（调用方需持有 _lock）"""
         try:
-            cache_dir = os.path.dirname(VOICE_CLONE_CACHE_FILE)
-            os.makedirs(cache_dir, exist_ok=True)
-            with open(VOICE_CLONE_CACHE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(cls._cache, f, indent=2, ensure_ascii=False)
+            os.makedirs(os.path.dirname(VOICE_CLONE_CACHE_LOG_FILE), exist_ok=True)
+            with open(VOICE_CLONE_CACHE_LOG_FILE, 'ab') as f:
+                f.write(_json_dumps(record, indent=False) + b"\n")
+            cls._log_entries += 1
         except Exception as e:
             print(f"⚠️  保存声音克隆缓存失败: {e}")
 
+    @classmethod
+    def _maybe_compact(cls):
+        """日志条数超过存活条目 2 倍时，安排一次压缩（延迟合并执行）"""
+        if cls._log_entries > max(2 * len(cls._cache), cls.COMPACT_MIN_LOG_ENTRIES):
+            cls._writer.schedule()
+
+    @classmethod
+    def _compact(cls):
+        """将内存缓存写成新快照（原子替换）并清空日志"""
+        with cls._lock:
+            if cls._cache is None:
+                return
+            try:
+                _atomic_write_json(
+                    VOICE_CLONE_CACHE_FILE,
+                    {"version": cls.CACHE_VERSION, "entries": cls._cache},
+                )
+                # 快照已包含全部记录，此时清空日志；即使在两步之间中断，重放日志也是幂等的
+                open(VOICE_CLONE_CACHE_LOG_FILE, 'wb').close()
+                cls._log_entries = 0
+            except Exception as e:
+                print(f"⚠️  保存声音克隆缓存失败: {e}")
+
     @classmethod
     def _make_key(cls, file_hash, model_type):
         """生成缓存 key"""
@@ -279,30 +504,78 @@ class VoiceCloneCache:
         """
         cls._load()
         key = cls._make_key(file_hash, model_type)
-        cls._cache[key] = {
+        entry = {
             "voice_id": voice_id,
             "model_type": model_type,
             "created_at": time.time(),
         }
-        cls._save()
+        with cls._lock:
+            cls._cache[key] = entry
+            cls._append_log({"op": "put", "key": key, "entry": entry})
+        cls._maybe_compact()
 
     @classmethod
     def remove(cls, file_hash, model_type):
         """删除某条缓存（声音过期/失效时调用）"""
         cls._load()
         key = cls._make_key(file_hash, model_type)
-        if key in cls._cache:
-            del cls._cache[key]
-            cls._save()
+        with cls._lock:
+            if cls._cache.pop(key, None) is None:
+                return
+            cls._append_log({"op": "del", "key": key})
+        cls._maybe_compact()
+
+
+_HASH_CACHE = OrderedDict()  # {(abspath, mtime_ns, size): hexdigest}
+_HASH_CACHE_MAX = 128
+_HASH_LOCK = threading.Lock()  # 保护 _HASH_CACHE（并行执行的节点可能同时计算指纹）
+_HASH_MMAP_THRESHOLD = 1 << 20  # 超过 1 MiB 的文件使用 mmap 计算哈希
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def _new_file_hasher():
+    """文件指纹哈希器（BLAKE2b-128，仅作缓存 key，无需密码学强度）"""
+    return hashlib.blake2b(digest_size=16)
 
 
 def file_content_hash(file_path):
-    """计算文件内容的 MD5 哈希值"""
-    h = hashlib.md5()
+    """
+    计算文件内容的 BLAKE2b 哈希值（32 位十六进制）
+    进程内按 (路径, 修改时间, 大小) 做 LRU 缓存，文件未变化时不再重复读取
+    缓存的查找与写入在锁内完成；哈希计算本身在锁外进行，不阻塞其他文件
+    """
+    st = os.stat(file_path)
+    key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+    with _HASH_LOCK:
+        cached = _HASH_CACHE.get(key)
+        if cached is not None:
+            _HASH_CACHE.move_to_end(key)
+            return cached
+
     with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
+        if st.st_size > _HASH_MMAP_THRESHOLD:
+            # 大文件：内存映射后按 1 MiB 切片（memoryview，零拷贝）交给 C 层哈希
+            h = _new_file_hasher()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    for offset in range(0, len(view), _HASH_CHUNK_SIZE):
+                        h.update(view[offset:offset + _HASH_CHUNK_SIZE])
+            digest = h.hexdigest()
+        elif hasattr(hashlib, "file_digest"):
+            # Python 3.11+：哈希循环在 C 层执行
+            digest = hashlib.file_digest(f, _new_file_hasher).hexdigest()
+        else:
+            h = _new_file_hasher()
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                h.update(chunk)
+            digest = h.hexdigest()
+
+    with _HASH_LOCK:
+        _HASH_CACHE[key] = digest
+        _HASH_CACHE.move_to_end(key)
+        while len(_HASH_CACHE) > _HASH_CACHE_MAX:
+            _HASH_CACHE.popitem(last=False)
+    return digest
 
 
 # ==================== 频率控制器 ====================
@@ -312,30 +585,34 @@ class RateLimiter:
     按接口类型分别控制频率
     - lip_sync / voice_clone: 10 RPM → 间隔6秒
     - tts:                    200 RPM → 间隔0.3秒
+    - file_poll:              文件同步轮询，自带退避间隔 → 不额外限制
     - default:                通用 → 间隔1秒
     """
-    _timestamps = {}  # {category: last_call_time}
+    _next_allowed = {}  # {category: 下次允许调用的时间（time.monotonic）}
+    _lock = threading.Lock()  # 并行请求（如同时上传视频和音频）时按顺序分配调用时间
     _intervals = {
         "lip_sync": 6.0,      # 10 RPM
         "voice_clone": 6.0,   # 10 RPM
         "tts": 0.5,           # 200 RPM（留一定余量）
+        "file_poll": 0.0,     # upload_file 同步轮询（由指数退避控制间隔）
         "default": 1.0,
     }
 
     @classmethod
     def wait(cls, category="default", silent=False):
         interval = cls._intervals.get(category, cls._intervals["default"])
-        last_time = cls._timestamps.get(category, 0)
-        elapsed = time.time() - last_time
-
-        if elapsed < interval:
-            wait_time = interval - elapsed
+        # 使用单调时钟，不受系统时间调整影响；加锁预占调用时间，锁外等待
+        with cls._lock:
+            now = time.monotonic()
+            slot = max(now, cls._next_allowed.get(category, 0.0))
+            cls._next_allowed[category] = slot + interval
+        wait_time = slot - now
+
+        if wait_time > 0:
             if not silent:
                 print(f"⏱️  频率控制({category})：等待 {wait_time:.1f}s...")
             time.sleep(wait_time)
 
-        cls._timestamps[category] = time.time()
-
 
 # ==================== 进度条管理 ====================
 
@@ -362,6 +639,8 @@ class CicadaProgress:
         progress.finish("完成！")            # 100%
     """
 
+    PRINT_INTERVAL = 0.5  # 终端进度行最小输出间隔（秒）
+
     def __init__(self, stages):
         """
         stages: [(name, weight), ...] 阶段列表
@@ -383,6 +662,8 @@ class CicadaProgress:
         self._stage_idx = -1
         self._comfy_bar = None
         self._last_msg = ""
+        self._last_sent_pct = -1  # 上次推送的百分比（未变化时不重复推送）
+        self._last_print = float("-inf")  # 上次终端输出时间（monotonic）
         
         # 初始化 ComfyUI 进度条
         try:
@@ -391,9 +672,16 @@ class CicadaProgress:
         except Exception:
             pass
 
-    def _set_progress(self, pct, msg=""):
-        """设置全局进度百分比（0-100）"""
+    def _set_progress(self, pct, msg="", force_print=False):
+        """
+        设置全局进度百分比（0-100），百分比和文案都未变化时跳过
+        前端进度条每次都更新；终端输出按 PRINT_INTERVAL 节流（上传时每个分块都会调用），
+        force_print（阶段切换/开始/完成）及 100% 时必打印
+        """
         pct = max(0, min(100, int(pct)))
+        if pct == self._last_sent_pct and msg == self._last_msg:
+            return
+        self._last_sent_pct = pct
         self._last_msg = msg
         
         # 更新 ComfyUI 前端进度条
@@ -401,6 +689,10 @@ class CicadaProgress:
             self._comfy_bar.update_absolute(pct, 100)
         
         # 终端输出
+        now = time.monotonic()
+        if not force_print and pct < 100 and now - self._last_print < self.PRINT_INTERVAL:
+            return
+        self._last_print = now
         filled = int(30 * pct / 100)
         bar = '█' * filled + '░' * (30 - filled)
         status = f" - {msg}" if msg else ""
@@ -408,7 +700,7 @@ class CicadaProgress:
     
     def start(self):
         """开始任务"""
-        self._set_progress(0, "准备中...")
+        self._set_progress(0, "准备中...", force_print=True)
     
     def advance(self, stage_name):
         """
@@ -418,7 +710,7 @@ class CicadaProgress:
         for i, stage in enumerate(self.stages):
             if stage["name"] == stage_name:
                 self._stage_idx = i
-                self._set_progress(stage["start_pct"], stage_name)
+                self._set_progress(stage["start_pct"], stage_name, force_print=True)
                 return
         # 未找到阶段名，忽略
         print(f"⚠️  未知阶段: {stage_name}")
@@ -438,11 +730,51 @@ class CicadaProgress:
     
     def finish(self, msg="完成！"):
         """任务完成，进度设为 100%"""
-        self._set_progress(100, msg)
+        self._set_progress(100, msg, force_print=True)
 
 
 # ==================== 网络请求工具 ====================
 
+# 全局复用的 HTTP 会话：连接池保持 TCP/TLS 长连接（requests 默认发送 Connection: keep-alive），
+# 轮询时无需每次重新握手。流式下载的响应需读完或 close() 后连接才会归还连接池。
+# 连接池层仅对网关类 5xx 做退避重试（POST 不重试，避免重复创建任务）；
+# 网络错误/超时的重试由 api_request 负责，这里不重复。
+_HTTP_RETRY = Retry(
+    total=3, connect=0, read=0, status=3,
+    backoff_factor=0.5,
+    status_forcelist=[502, 503, 504],
+    raise_on_status=False,  # 重试耗尽后返回最后的响应，由 raise_for_status 统一抛 HTTPError
+)
+_SESSION = requests.Session()
+for _prefix in ("https://", "http://"):
+    _SESSION.mount(_prefix, HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=_HTTP_RETRY))
+_SESSION.headers["User-Agent"] = "cicada-comfy"
+
+_warmed = False
+_warm_lock = threading.Lock()
+
+
+def _warm_up_request():
+    """发送一次 HEAD 请求建立连接，响应立即关闭以归还连接池"""
+    try:
+        _SESSION.head(BASE_URL, timeout=5).close()
+    except Exception:
+        pass  # 预热失败不影响后续正常请求
+
+
+def warm_up_connection():
+    """
+    后台预热到 BASE_URL 的连接（DNS + TCP + TLS），每个进程只执行一次。
+    节点实例化时调用，首个鉴权/创建请求即可直接复用连接池中已建立的连接。
+    """
+    global _warmed
+    with _warm_lock:
+        if _warmed:
+            return
+        _warmed = True
+    threading.Thread(target=_warm_up_request, daemon=True).start()
+
+
 def api_request(method, url, max_retries=3, retry_delay=3, rate_category="default", silent_rate=False, **kwargs):
     """
     带重试和频率控制的 HTTP 请求
@@ -457,7 +789,7 @@ def api_request(method, url, max_retries=3, retry_delay=3, rate_category="defaul
         try:
             if "timeout" not in kwargs:
                 kwargs["timeout"] = 30
-            response = requests.request(method, url, **kwargs)
+            response = _SESSION.request(method, url, **kwargs)
             response.raise_for_status()
             return response
         except requests.exceptions.ConnectionError as e:
@@ -484,7 +816,13 @@ def api_json_request(method, url, rate_category="default", silent_rate=False,
     发送请求并解析JSON响应，检查业务状态码
     - Token 过期时自动刷新并重试一次
     - 已知错误提供清晰的中文提示和解决方案
+    - json= 请求体在此一次性序列化为 bytes（优先 orjson），网络重试与 Token 刷新后的重试复用同一份
     """
+    if kwargs.get("json") is not None:
+        kwargs["data"] = _json_dumps(kwargs.pop("json"), indent=False)
+        headers = dict(kwargs.get("headers") or {})
+        headers["Content-Type"] = "application/json"
+        kwargs["headers"] = headers
     response = api_request(method, url, rate_category=rate_category, silent_rate=silent_rate, **kwargs)
     result = response.json()
     code = result.get("code")
@@ -534,6 +872,11 @@ def api_json_request(method, url, rate_category="default", silent_rate=False,
     raise Exception(f"❌ API 请求失败 (code={code}): {msg}")
 
 
+# 蝉豆扣费失败关键词（预编译为单个正则，匹配在 C 层完成）
+_BILLING_KEYWORDS = ("扣费失败", "余额不足", "蝉豆不足", "蝉豆余额", "欠费")
+_BILLING_RE = re.compile("|".join(map(re.escape, _BILLING_KEYWORDS)))
+
+
 def check_billing_error(msg):
     """
     检测详情接口返回的 msg 是否为蝉豆扣费失败。
@@ -541,10 +884,7 @@ def check_billing_error(msg):
     而是在详情轮询接口的 msg 字段中返回 "扣费失败" 等信息。
     如果检测到扣费失败，抛出包含充值引导的友好异常。
     """
-    if not msg:
-        return
-    billing_keywords = ["扣费失败", "余额不足", "蝉豆不足", "蝉豆余额", "欠费"]
-    if any(kw in msg for kw in billing_keywords):
+    if msg and _BILLING_RE.search(msg):
         raise Exception(
             f"❌ 蝉豆余额不足，扣费失败\n\n"
             f"当前操作需要消耗蝉豆，您的账户余额不足。\n"
@@ -560,6 +900,32 @@ def check_billing_error(msg):
 BASE_URL = "https://open-api.chanjing.cc"
 
 
+def adaptive_sleep(attempt, min_s=1.0, max_s=15.0, rate=1.5):
+    """
+    轮询退避间隔（秒）：随连续无变化次数 attempt 指数增长，上限 max_s，带随机抖动
+    attempt=0 时固定返回 min_s（状态刚变化或接近完成时尽快再查）
+    """
+    return random.uniform(min_s, min(max_s, min_s * rate ** attempt))
+
+
+# 轮询循环中仅进度变化的日志，同一任务类型至多每 POLL_LOG_INTERVAL 秒打印一行（进度条仍实时更新）
+POLL_LOG_INTERVAL = 5.0
+_LOG_LAST_EMIT = {}  # throttled_log: key → 上次输出时间（monotonic）
+
+
+def throttled_log(key, msg, min_interval=0.5, force=False):
+    """
+    按 key 节流的 print：同一 key 距上次输出不足 min_interval 秒时丢弃本条
+    force=True 时必定输出（状态切换等关键信息不能丢）；返回是否已输出
+    """
+    now = time.monotonic()
+    if not force and now - _LOG_LAST_EMIT.get(key, float("-inf")) < min_interval:
+        return False
+    _LOG_LAST_EMIT[key] = now
+    print(msg)
+    return True
+
+
 def format_file_size(size_bytes):
     """格式化文件大小"""
     for unit in ['B', 'KB', 'MB', 'GB']:
@@ -569,15 +935,57 @@ def format_file_size(size_bytes):
     return f"{size_bytes:.1f} TB"
 
 
+def _wav_duration_from_header(file_path):
+    """
+    仅解析 WAV 文件头（RIFF 块）计算时长，无需读取 PCM 数据
+    返回: float（秒）或 None（非标准 WAV / 解析失败）
+    """
+    try:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, 'rb') as f:
+            riff, _, wave = struct.unpack('<4sI4s', f.read(12))
+            if riff != b'RIFF' or wave != b'WAVE':
+                return None
+            byte_rate = None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    return None
+                chunk_id, chunk_size = struct.unpack('<4sI', header)
+                if chunk_id == b'fmt ':
+                    fmt = f.read(chunk_size)
+                    if len(fmt) < 12:
+                        return None
+                    byte_rate = struct.unpack_from('<I', fmt, 8)[0]  # 偏移 28: byte_rate
+                    if chunk_size % 2:
+                        f.seek(1, os.SEEK_CUR)
+                elif chunk_id == b'data':
+                    if not byte_rate:
+                        return None
+                    # 流式写入的 WAV 可能未回填 data 大小，按文件剩余长度估算
+                    data_size = min(chunk_size, file_size - f.tell())
+                    return data_size / float(byte_rate)
+                else:
+                    f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+    except Exception:
+        return None
+
+
 def get_audio_duration(file_path):
     """
     获取音频文件时长（秒）
-    优先使用 mutagen（最准确），否则尝试 pydub（需要ffmpeg），最后尝试 scipy（仅wav）
+    WAV 优先直接解析文件头；其次使用 mutagen（支持多种格式），最后尝试 scipy（仅wav）
     返回: float（秒）或 None（无法获取）
     """
     if not os.path.exists(file_path):
         return None
 
+    # 方法0: WAV 文件头（仅读取几十字节，不加载音频数据）
+    if os.path.splitext(file_path)[1].lower() == ".wav":
+        duration = _wav_duration_from_header(file_path)
+        if duration is not None:
+            return duration
+
     # 方法1: mutagen（支持 mp3/wav/m4a/flac/ogg 等，最推荐）
     if MUTAGEN_AVAILABLE:
         try:
@@ -588,28 +996,53 @@ def get_audio_duration(file_path):
             pass
 
     # 方法2: scipy（仅支持 wav）
-    try:
-        from scipy.io import wavfile
-        sample_rate, data = wavfile.read(file_path)
-        return len(data) / float(sample_rate)
-    except Exception:
-        pass
+    wavfile = _scipy_wavfile()
+    if wavfile is not None:
+        try:
+            sample_rate, data = wavfile.read(file_path, mmap=True)  # 只需长度，不载入 PCM
+            return len(data) / float(sample_rate)
+        except Exception:
+            pass
 
     return None
 
 
+_TOOL_PATHS = {}  # {命令名: 路径}，只缓存找到的结果
+
+
+def _which_cached(name):
+    """
+    查找系统命令路径：找到后进程内缓存，不再遍历 PATH；
+    未找到时不缓存，用户按提示安装后无需重启 ComfyUI 即可生效
+    """
+    path = _TOOL_PATHS.get(name)
+    if path is None:
+        path = shutil.which(name)
+        if path:
+            _TOOL_PATHS[name] = path
+    return path
+
+
+def _ffmpeg():
+    """查找系统 ffmpeg 路径"""
+    return _which_cached("ffmpeg")
+
+
+def _ffprobe():
+    """查找系统 ffprobe 路径"""
+    return _which_cached("ffprobe")
+
+
 def trim_audio(file_path, max_duration=299):
     """
     裁剪音频到指定时长（秒）
     直接调用系统 ffmpeg，无需额外 Python 依赖
     返回: 裁剪后的文件路径，失败返回 None
     """
-    import tempfile
-    import shutil
     import subprocess
     
     # 查找系统 ffmpeg
-    ffmpeg_path = shutil.which("ffmpeg")
+    ffmpeg_path = _ffmpeg()
     if not ffmpeg_path:
         print("❌ 未检测到系统 ffmpeg，无法裁剪音频")
         print("   安装方法: brew install ffmpeg")
@@ -661,78 +1094,137 @@ def format_duration(seconds):
     return f"{minutes}:{secs:02d}"
 
 
-def extract_file_path(file_input, file_type="文件"):
-    """
-    从各种输入类型中智能提取文件路径。
-    支持：字符串、字典、列表、ComfyUI 原生 VideoFromFile/AudioInput 等对象。
-    """
-    import io as _io
+# ---------- 文件路径提取 ----------
+# 每个提取器返回文件路径(str)，不适用时返回 None；按顺序尝试
 
-    # 1. 字符串 → 直接返回
-    if isinstance(file_input, str):
-        return file_input
+def _extract_from_stream_source(file_input, file_type):
+    """ComfyUI 原生视频/音频对象（VideoFromFile / VideoInput 等）
+    公开方法 get_stream_source() 返回文件路径(str) 或 BytesIO"""
+    if not hasattr(file_input, 'get_stream_source'):
+        return None
+    source = file_input.get_stream_source()
+    if isinstance(source, str):
+        return source
+    # BytesIO → 保存为临时文件
+    if isinstance(source, io.BytesIO):
+        return _save_bytes_to_temp(source, file_type)
+    return None
 
-    # 2. ComfyUI 原生视频/音频对象（VideoFromFile / VideoInput 等）
-    #    公开方法 get_stream_source() 返回文件路径(str) 或 BytesIO
-    if hasattr(file_input, 'get_stream_source'):
-        source = file_input.get_stream_source()
-        if isinstance(source, str):
-            return source
-        # BytesIO → 保存为临时文件
-        if isinstance(source, _io.BytesIO):
-            return _save_bytes_to_temp(source, file_type)
-
-    # 3. ComfyUI 原生视频对象的 save_to 方法
-    if hasattr(file_input, 'save_to') and not isinstance(file_input, (str, dict)):
-        import tempfile
-        suffix = ".mp4" if "视频" in file_type or "video" in file_type.lower() else ".wav"
-        tmp = tempfile.NamedTemporaryFile(
-            delete=False, suffix=suffix,
-            dir=folder_paths.get_temp_directory()
-        )
-        tmp.close()
-        file_input.save_to(tmp.name)
-        print(f"📁 已将 {type(file_input).__name__} 保存为临时文件: {tmp.name}")
-        return tmp.name
 
-    # 4. ComfyUI AudioInput (dict with 'waveform' and 'sample_rate')
+def _extract_by_save_to(file_input, file_type):
+    """ComfyUI 原生视频对象的 save_to 方法"""
+    if not hasattr(file_input, 'save_to') or isinstance(file_input, (str, dict)):
+        return None
+    suffix = ".mp4" if "视频" in file_type or "video" in file_type.lower() else ".wav"
+    tmp = tempfile.NamedTemporaryFile(
+        delete=False, suffix=suffix,
+        dir=folder_paths.get_temp_directory()
+    )
+    tmp.close()
+    file_input.save_to(tmp.name)
+    print(f"📁 已将 {type(file_input).__name__} 保存为临时文件: {tmp.name}")
+    return tmp.name
+
+
+def _extract_from_audio_dict(file_input, file_type):
+    """ComfyUI AudioInput (dict with 'waveform' and 'sample_rate')"""
     if isinstance(file_input, dict) and 'waveform' in file_input and 'sample_rate' in file_input:
         return _save_audio_dict_to_temp(file_input)
+    return None
+
+
+def _extract_from_dict(file_input, file_type):
+    """普通字典 → 查找路径键"""
+    if not isinstance(file_input, dict):
+        return None
+    for key in ['path', 'file', 'filename', 'filepath', 'file_path', 'url', 'source']:
+        if key in file_input and isinstance(file_input[key], str):
+            return file_input[key]
+    if len(file_input) == 1:
+        value = list(file_input.values())[0]
+        if isinstance(value, str):
+            return value
+    return None
+
+
+def _extract_from_sequence(file_input, file_type):
+    """列表/元组 → 递归提取"""
+    if not isinstance(file_input, (list, tuple)):
+        return None
+    for item in file_input:
+        if isinstance(item, str):
+            return item
+        if isinstance(item, dict):
+            try:
+                return extract_file_path(item, file_type)
+            except Exception:
+                continue
+    return None
 
-    # 5. 普通字典 → 查找路径键
-    if isinstance(file_input, dict):
-        for key in ['path', 'file', 'filename', 'filepath', 'file_path', 'url', 'source']:
-            if key in file_input and isinstance(file_input[key], str):
-                return file_input[key]
-        if len(file_input) == 1:
-            value = list(file_input.values())[0]
-            if isinstance(value, str):
-                return value
-
-    # 6. 列表/元组 → 递归提取
-    if isinstance(file_input, (list, tuple)):
-        for item in file_input:
-            if isinstance(item, str):
-                return item
-            if isinstance(item, dict):
-                try:
-                    return extract_file_path(item, file_type)
-                except Exception:
-                    continue
 
-    # 7. 通用对象属性
+def _extract_from_attrs(file_input, file_type):
+    """通用对象属性"""
     for attr in ('path', 'file', 'filename'):
         if hasattr(file_input, attr):
             val = getattr(file_input, attr)
             if isinstance(val, str):
                 return val
+    return None
+
 
-    # 8. 尝试访问私有属性（兜底：VideoFromFile.__file → _VideoFromFile__file）
+def _extract_from_mangled_attrs(file_input, file_type):
+    """尝试访问私有属性（兜底：VideoFromFile.__file → _VideoFromFile__file）"""
     for mangled in ('_VideoFromFile__file', '_AudioFromFile__file'):
         if hasattr(file_input, mangled):
             val = getattr(file_input, mangled)
             if isinstance(val, str):
                 return val
+    return None
+
+
+_EXTRACTOR_CHAIN = (
+    _extract_from_stream_source,
+    _extract_by_save_to,
+    _extract_from_audio_dict,
+    _extract_from_dict,
+    _extract_from_sequence,
+    _extract_from_attrs,
+    _extract_from_mangled_attrs,
+)
+
+# {type: extractor}：记录每种输入类型上次成功的提取器，下次直接命中
+# dict/list/tuple 的提取方式取决于内容而非类型，不做缓存
+_EXTRACTORS = {}
+_UNCACHED_INPUT_TYPES = (dict, list, tuple)
+
+
+def extract_file_path(file_input, file_type="文件"):
+    """
+    从各种输入类型中智能提取文件路径。
+    支持：字符串、字典、列表、ComfyUI 原生 VideoFromFile/AudioInput 等对象。
+    """
+    # 字符串 → 直接返回
+    if isinstance(file_input, str):
+        return file_input
+
+    input_type = type(file_input)
+    cacheable = input_type not in _UNCACHED_INPUT_TYPES
+
+    # 同类型输入优先使用上次成功的提取器
+    cached = _EXTRACTORS.get(input_type) if cacheable else None
+    if cached is not None:
+        path = cached(file_input, file_type)
+        if path is not None:
+            return path
+
+    for extractor in _EXTRACTOR_CHAIN:
+        if extractor is cached:
+            continue
+        path = extractor(file_input, file_type)
+        if path is not None:
+            if cacheable:
+                _EXTRACTORS[input_type] = extractor
+            return path
 
     # 调试信息：列出对象所有属性，帮助排查兼容性问题
     obj_attrs = [a for a in dir(file_input) if not a.startswith('__')]
@@ -747,27 +1239,33 @@ def extract_file_path(file_input, file_type="文件"):
 
 def _save_bytes_to_temp(bytesio, file_type):
     """将 BytesIO 保存为临时文件并返回路径"""
-    import tempfile
     suffix = ".mp4" if "视频" in file_type or "video" in file_type.lower() else ".wav"
     tmp = tempfile.NamedTemporaryFile(
         delete=False, suffix=suffix,
         dir=folder_paths.get_temp_directory()
     )
     bytesio.seek(0)
-    tmp.write(bytesio.read())
+    shutil.copyfileobj(bytesio, tmp, length=1024 * 1024)  # 分块写入，避免再复制一份完整数据
     tmp.close()
     print(f"📁 已将 BytesIO 保存为临时文件: {tmp.name}")
     return tmp.name
 
 
+def _to_batched_waveform(data):
+    """
+    (samples,) 或 (samples, channels) 的 ndarray → 内存连续的 (1, channels, samples)
+    单声道只是 reshape 视图；多声道转置时一次性拷贝为连续布局
+    """
+    if data.ndim == 1:
+        return data.reshape(1, 1, -1)
+    return np.ascontiguousarray(data.T)[np.newaxis]
+
+
 def _save_audio_dict_to_temp(audio_dict):
     """
     将 ComfyUI AudioInput dict (waveform + sample_rate) 保存为临时 wav 文件。
     优先使用 scipy，其次 soundfile，最后 torchaudio（需要 ffmpeg 后端）。
     """
-    import tempfile
-    import numpy as np
-
     waveform = audio_dict['waveform']
     sample_rate = int(audio_dict['sample_rate'])
 
@@ -783,94 +1281,294 @@ def _save_audio_dict_to_temp(audio_dict):
     )
     tmp.close()
 
+    # 后端按顺序逐个解析，前一种可用时不会导入后面的模块
     # 方法1：scipy.io.wavfile（最常见，无需额外依赖）
-    try:
-        from scipy.io import wavfile
+    wavfile = _scipy_wavfile()
+    if wavfile is not None:
         # scipy 要求 int16 或 float32
         if audio_np.dtype == np.float64:
             audio_np = audio_np.astype(np.float32)
         wavfile.write(tmp.name, sample_rate, audio_np)
         print(f"📁 已将音频数据保存为临时文件（scipy）: {tmp.name}")
         return tmp.name
-    except ImportError:
-        pass
 
     # 方法2：soundfile（需要安装但不需要 ffmpeg）
-    try:
-        import soundfile as sf
-        sf.write(tmp.name, audio_np, sample_rate)
+    soundfile = _soundfile()
+    if soundfile is not None:
+        soundfile.write(tmp.name, audio_np, sample_rate)
         print(f"📁 已将音频数据保存为临时文件（soundfile）: {tmp.name}")
         return tmp.name
-    except ImportError:
-        pass
 
     # 方法3：torchaudio（需要 ffmpeg/sox 后端）
-    try:
-        import torchaudio
-        torchaudio.save(tmp.name, waveform.cpu(), sample_rate)
-        print(f"📁 已将音频数据保存为临时文件（torchaudio）: {tmp.name}")
-        return tmp.name
-    except Exception as e:
-        raise Exception(
-            f"❌ 无法保存音频文件。尝试了 scipy/soundfile/torchaudio 均失败。\n"
-            f"最后错误: {e}\n"
-            f"建议: pip install scipy 或 pip install soundfile"
-        )
+    last_error = "scipy / soundfile / torchaudio 均未安装"
+    torchaudio = _torchaudio()
+    if torchaudio is not None:
+        try:
+            torchaudio.save(tmp.name, waveform.cpu(), sample_rate)
+            print(f"📁 已将音频数据保存为临时文件（torchaudio）: {tmp.name}")
+            return tmp.name
+        except Exception as e:
+            last_error = e
+    raise Exception(
+        f"❌ 无法保存音频文件。尝试了 scipy/soundfile/torchaudio 均失败。\n"
+        f"最后错误: {last_error}\n"
+        f"建议: pip install scipy 或 pip install soundfile"
+    )
 
 
 class UploadProgress:
     """
-    文件上传进度包装器
-    将 bytes 包装为可读对象，requests 会分块读取，每块读取时打印进度。
-    支持可选的 on_progress 回调，用于同步更新 ComfyUI 前端进度条。
+    文件上传进度包装器（流式读取）
+    按块从磁盘读取文件交给 requests 发送，不会把整个文件载入内存。
+    终端进度每 20% 且间隔不少于 0.2 秒打印一次（100% 总会打印）。
+    支持可选的 on_progress 回调（参数为已发送字节数，每块都会触发），用于同步更新 ComfyUI 前端进度条。
+    每次迭代都会重新打开文件，请求重试时可从头重新发送。
     
     注意：进度 100% 表示数据已被 requests 读取完毕，
     但实际网络传输和服务器响应可能还需要额外时间。
     """
 
-    def __init__(self, data, desc="上传", on_progress=None):
-        self._data = data
-        self._total = len(data)
-        self._pos = 0
+    def __init__(self, file_path, desc="上传", on_progress=None, chunk_size=1024 * 1024):
+        self._path = file_path
+        self._total = os.path.getsize(file_path)
+        self._total_str = format_file_size(self._total)
         self._desc = desc
-        self._last_pct = -20  # 确保首次就打印
-        self._on_progress = on_progress  # 回调: fn(pct, msg)
-        self._done_printed = False
+        self._chunk_size = chunk_size
+        self._on_progress = on_progress  # 回调: fn(sent_bytes)
+
+    def __iter__(self):
+        sent = 0
+        last_pct = -20  # 确保首次就打印
+        last_print_t = 0.0
+        with open(self._path, 'rb') as f:
+            while True:
+                chunk = f.read(self._chunk_size)
+                if not chunk:
+                    break
+                sent += len(chunk)
+
+                # 终端进度按百分比 + 时间间隔节流
+                if self._total > 0:
+                    pct = int(sent / self._total * 100)
+                    if pct >= 100 or pct >= last_pct + 20:
+                        now = time.monotonic()
+                        if pct >= 100 or now - last_print_t >= 0.2:
+                            print(f"   📤 {self._desc}: {pct}% ({format_file_size(sent)}/{self._total_str})")
+                            last_pct = pct
+                            last_print_t = now
 
-    def read(self, size=-1):
-        if self._pos >= self._total:
-            # 数据已全部读取，requests 可能还在等待服务器响应
-            if not self._done_printed:
-                self._done_printed = True
-                print(f"   ⏳ 数据已发送，等待服务器响应...")
-            return b""
-        if size == -1 or size is None:
-            chunk = self._data[self._pos:]
-            self._pos = self._total
-        else:
-            end = min(self._pos + size, self._total)
-            chunk = self._data[self._pos:end]
-            self._pos = end
-
-        # 每 20% 打印一次进度 + 更新前端进度条
-        if self._total > 0:
-            pct = int(self._pos / self._total * 100)
-            if pct >= self._last_pct + 20 or pct >= 100:
-                msg = f"{self._desc}: {pct}%"
-                print(f"   📤 {msg} ({format_file_size(self._pos)}/{format_file_size(self._total)})")
-                self._last_pct = pct
+                # 前端进度条每块都更新
                 if self._on_progress:
-                    self._on_progress(pct, msg)
+                    self._on_progress(sent)
+
+                yield chunk
 
-        return chunk
+        # 数据已全部读取，requests 可能还在等待服务器响应
+        print(f"   ⏳ 数据已发送，等待服务器响应...")
 
     def __len__(self):
         return self._total
 
 
+class UploadProgressGroup:
+    """
+    并行上传进度合并器
+    多个文件同时上传时，将各自的进度按文件大小加权合并到同一个 CicadaProgress 阶段。
+
+    用法:
+        group = UploadProgressGroup(progress, {"视频": video_size, "音频": audio_size})
+        upload_file(video_path, ..., progress=group.tracker("视频"))
+    """
+
+    class _Tracker:
+        """单个文件的进度入口（接口与 CicadaProgress.update 一致）"""
+
+        def __init__(self, group, name):
+            self._group = group
+            self._name = name
+
+        def update(self, inner_pct, msg=None):
+            self._group._update(self._name, inner_pct)
+
+    def __init__(self, progress, sizes):
+        self._progress = progress
+        self._weights = {name: max(size, 1) for name, size in sizes.items()}
+        self._pcts = {name: 0 for name in sizes}
+        self._lock = threading.Lock()
+
+    def tracker(self, name):
+        return self._Tracker(self, name)
+
+    def _update(self, name, inner_pct):
+        with self._lock:
+            self._pcts[name] = inner_pct
+            total_weight = sum(self._weights.values())
+            pct = sum(self._pcts[n] * w for n, w in self._weights.items()) / total_weight
+            detail = " / ".join(f"{n} {int(p)}%" for n, p in self._pcts.items())
+            if self._progress:
+                self._progress.update(pct, f"上传中（{detail}）")
+
+
+class _ProgressReader:
+    """
+    下载进度包装器：包装 response.raw，被 shutil.copyfileobj 读取时统计字节数，
+    按时间节流打印进度（至多每 0.25 秒一次，完成时必打印）
+    """
+
+    def __init__(self, raw, total):
+        self._raw = raw
+        self._total = total
+        self.done = 0
+        self._last_emit = time.monotonic()
+
+    def read(self, size=-1):
+        data = self._raw.read(size)
+        self.done += len(data)
+        if data and self._total > 0:
+            now = time.monotonic()
+            if now - self._last_emit >= 0.25 or self.done >= self._total:
+                print(f"📥 下载: {min(100, int(self.done / self._total * 100))}%")
+                self._last_emit = now
+        return data
+
+
+def _copy_response_to_file(response, f):
+    """将流式响应写入文件（copyfileobj 以 1 MiB 缓冲复制），返回写入字节数"""
+    response.raw.decode_content = True  # 与 iter_content 一致，自动解压 gzip 等传输编码
+    reader = _ProgressReader(response.raw, int(response.headers.get('content-length', 0)))
+    shutil.copyfileobj(reader, f, length=1024 * 1024)
+    return reader.done
+
+
+# ==================== 下载缓存 ====================
+# 按 URL（去掉查询参数）做内容寻址的本地缓存，供可选开启的节点复用已下载的结果文件
+
+DOWNLOAD_CACHE_MAX_FILES = 50  # 每个缓存目录最多保留的文件数（超出按最近访问时间淘汰）
+_DOWNLOAD_CACHE_NAME_RE = re.compile(r"^cicada_cache_[0-9a-f]{32}\.\w+$")
+
+
+def _download_cache_path(url, cache_dir, ext):
+    """缓存文件路径：cicada_cache_<blake2b(去掉查询参数的 URL)><ext>，签名参数变化不影响命中"""
+    key = hashlib.blake2b(url.split("?")[0].encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(cache_dir, f"cicada_cache_{key}{ext}")
+
+
+def _touch_atime(path):
+    """命中时刷新访问时间（不少系统以 relatime/noatime 挂载，不能依赖读取自动更新）"""
+    try:
+        os.utime(path, (time.time(), os.stat(path).st_mtime))
+    except OSError:
+        pass
+
+
+def _prune_download_cache(cache_dir, max_files=DOWNLOAD_CACHE_MAX_FILES):
+    """缓存文件超出上限时，按 st_atime 删除最久未访问的文件（连同 .etag 记录）"""
+    try:
+        entries = [
+            e for e in os.scandir(cache_dir)
+            if _DOWNLOAD_CACHE_NAME_RE.match(e.name) and e.is_file()
+        ]
+    except OSError:
+        return
+    if len(entries) <= max_files:
+        return
+    entries.sort(key=lambda e: e.stat().st_atime)
+    for entry in entries[:-max_files]:
+        for path in (entry.path, entry.path + ".etag"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    print(f"🧹 已清理 {len(entries) - max_files} 个过期下载缓存")
+
+
+def download_with_cache(url, cache_dir, ext):
+    """
+    下载 URL 到 cache_dir（内容寻址缓存），返回 (本地路径, 是否命中缓存)
+    - 有 ETag 记录时发送 If-None-Match 条件请求：304 直接复用，200 覆盖下载
+    - 无 ETag 记录时直接信任已有文件（结果地址通常自带内容哈希）
+    - 先写临时文件再替换，下载中断不会留下残缺的缓存
+    """
+    path = _download_cache_path(url, cache_dir, ext)
+    etag_path = path + ".etag"
+    etag = None
+    if os.path.exists(path):
+        try:
+            with open(etag_path, 'r', encoding='utf-8') as f:
+                etag = f.read().strip() or None
+        except OSError:
+            etag = None
+        if etag is None:
+            _touch_atime(path)
+            return path, True
+
+    headers = {"If-None-Match": etag} if etag else {}
+    try:
+        response = api_request("GET", url, rate_category="default", stream=True, timeout=300, headers=headers)
+    except Exception as e:
+        if etag is None:
+            raise
+        print(f"⚠️  缓存复验失败: {e}，使用本地缓存")
+        _touch_atime(path)
+        return path, True
+
+    with response:
+        if response.status_code == 304:
+            _touch_atime(path)
+            return path, True
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                _copy_response_to_file(response, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        new_etag = response.headers.get("ETag")
+
+    try:
+        if new_etag:
+            with open(etag_path, 'w', encoding='utf-8') as f:
+                f.write(new_etag)
+        elif os.path.exists(etag_path):
+            os.remove(etag_path)
+    except OSError:
+        pass
+    _prune_download_cache(cache_dir)
+    return path, False
+
+
+# get_access_token 的进程内短期缓存：同一次节点执行中的多次调用直接复用，
+# 不再每次检查 config.json；复用窗口过后重新走 CicadaAuth（凭证变更最迟在窗口结束后生效）
+_TOKEN_CACHE = {"token": None, "expires_at": 0.0}
+_TOKEN_LOCK = threading.Lock()
+_TOKEN_REUSE_SECONDS = 60
+
+
+def _clear_access_token_cache():
+    """作废 get_access_token 的短期缓存（CicadaAuth.reset 时调用）"""
+    with _TOKEN_LOCK:
+        _TOKEN_CACHE["token"] = None
+        _TOKEN_CACHE["expires_at"] = 0.0
+
+
 def get_access_token():
     """获取 AccessToken 的便捷入口（所有节点统一调用）"""
-    return CicadaAuth.get_token()
+    if _TOKEN_CACHE["token"] and time.time() < _TOKEN_CACHE["expires_at"]:
+        return _TOKEN_CACHE["token"]
+    with _TOKEN_LOCK:
+        # 等锁期间其他线程可能已获取完成
+        now = time.time()
+        if _TOKEN_CACHE["token"] and now < _TOKEN_CACHE["expires_at"]:
+            return _TOKEN_CACHE["token"]
+        token = CicadaAuth.get_token()
+        _TOKEN_CACHE["token"] = token
+        # 不超过 token 本身的刷新时间点（过期前 5 分钟）
+        _TOKEN_CACHE["expires_at"] = min(now + _TOKEN_REUSE_SECONDS, CicadaAuth._token_expire - 300)
+        return token
 
 
 def upload_file(file_path, service, access_token, progress=None):
@@ -880,6 +1578,9 @@ def upload_file(file_path, service, access_token, progress=None):
     progress: 可选的 CicadaProgress 实例，传入后上传过程中会同步更新 ComfyUI 前端进度条
     上传完成后会自动轮询文件状态，等待服务器同步完成（status=1）再返回
     返回 dict: {"file_id": "...", "url": "...(公网URL full_path)"}
+
+    注意：第二步是向预签名地址 PUT 原始文件内容（非 multipart 表单），
+    请求体由 UploadProgress 按 1 MiB 分块从磁盘流式读取，内存占用与文件大小无关。
     """
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"文件不存在: {file_path}")
@@ -913,24 +1614,21 @@ def upload_file(file_path, service, access_token, progress=None):
 
     # 步骤2：PUT 上传文件（与 API 文档保持一致，直接发送文件数据）
     print("📤 [2/2] 上传文件数据...")
-    with open(file_path, 'rb') as f:
-        file_data = f.read()
-    data_size = len(file_data)
-    print(f"   已读取文件: {format_file_size(data_size)}")
 
-    # 使用进度包装器，上传过程中显示进度（同时更新前端进度条）
-    def _on_upload_progress(pct, msg):
-        if progress:
-            progress.update(pct, msg)
+    # 使用流式进度包装器，边读边传，上传过程中显示进度（同时更新前端进度条）
+    def _on_upload_progress(sent_bytes):
+        if progress and file_size > 0:
+            pct = int(sent_bytes / file_size * 100)
+            progress.update(pct, f"上传{file_label}: {pct}%")
 
-    upload_body = UploadProgress(file_data, f"上传{file_label}", on_progress=_on_upload_progress)
+    upload_body = UploadProgress(file_path, f"上传{file_label}", on_progress=_on_upload_progress)
 
     response = api_request(
         "PUT", sign_url,
         max_retries=2, rate_category="default",
         headers={
             'Content-Type': mime_type,
-            'Content-Length': str(data_size),
+            'Content-Length': str(file_size),
         },
         data=upload_body,
         timeout=(15, 120),  # 连接超时15s，传输超时120s
@@ -943,27 +1641,30 @@ def upload_file(file_path, service, access_token, progress=None):
     print(f"🆔 文件ID: {file_id}")
 
     # 轮询文件状态，等待服务器同步完成（文档说明最长延迟1分钟）
-    poll_interval = 3  # 每次轮询间隔秒数
+    # 指数退避：1s 起步，每次 ×1.6，最长 10s；同步快时尽早返回，同步慢时减少请求次数
+    poll_delay = 1.0
+    max_poll_delay = 10.0
     max_poll_wait = 90  # 最长等待时间（秒），留一定余量
-    poll_start = time.time()
+    poll_start = time.monotonic()
     print(f"⏳ 等待文件同步...")
     while True:
-        elapsed = time.time() - poll_start
+        elapsed = time.monotonic() - poll_start
         if elapsed > max_poll_wait:
             raise TimeoutError(f"文件同步超时（已等待 {int(elapsed)}s），file_id: {file_id}")
-        time.sleep(poll_interval)
+        time.sleep(poll_delay)
+        poll_delay = min(poll_delay * 1.6, max_poll_delay)
         try:
             detail = api_json_request(
                 "GET",
                 f"{BASE_URL}/open/v1/common/file_detail",
-                rate_category="default",
+                rate_category="file_poll",
                 silent_rate=True,
                 params={"id": file_id},
                 headers={"access_token": access_token},
             )
             status = detail.get("data", {}).get("status", 0)
             if status == 1:
-                print(f"✅ 文件同步完成（耗时 {int(time.time() - poll_start)}s）")
+                print(f"✅ 文件同步完成（耗时 {int(time.monotonic() - poll_start)}s）")
                 break
             elif status in (98, 99, 100):
                 status_msg = {98: "内容安全检测失败", 99: "文件已删除", 100: "文件已清理"}
@@ -990,6 +1691,20 @@ def upload_file(file_path, service, access_token, progress=None):
 class CicadaLipSyncNode:
     """蝉镜 AI 对口型节点 - 音频驱动视频对口型"""
 
+    # 模型名 → 接口 model 参数（新增模型时需同步更新）
+    MODEL_MAP = {
+        "cicada-lip-sync": 0,
+        "cicada-lip-sync-pro": 1,
+    }
+
+    # 视频宽高缓存：{(abspath, mtime_ns, size): (w, h)}，仅缓存探测成功的结果
+    _DIMS_CACHE_MAX = 64
+    _dims_cache = OrderedDict()
+    _dims_lock = threading.Lock()
+
+    def __init__(self):
+        warm_up_connection()
+
     @classmethod
     def INPUT_TYPES(cls):
         return {
@@ -1000,7 +1715,7 @@ class CicadaLipSyncNode:
                 "audio_input": ("AUDIO", {
                     "tooltip": "cicada-lip-sync-pro provides clearer articulation and significantly improved naturalness and realism"
                 }),
-                "model": (["cicada-lip-sync", "cicada-lip-sync-pro"], {
+                "model": (list(cls.MODEL_MAP), {
                     "default": "cicada-lip-sync-pro",
                     "tooltip": "cicada-lip-sync-pro provides clearer articulation and significantly improved naturalness and realism"
                 }),
@@ -1021,8 +1736,74 @@ class CicadaLipSyncNode:
     CATEGORY = "Cicada AI"
     OUTPUT_NODE = False
 
+    # 详情接口长轮询（?wait=N，服务端挂起请求直到状态变化或超时）支持情况，进程内缓存：
+    # None=未探测, True=支持, False=不支持（回退为退避轮询）
+    LONG_POLL_WAIT = 30
+    _long_poll_supported = None
+
     @staticmethod
     def _get_video_dimensions(video_path):
+        """
+        获取视频显示宽高（已考虑旋转元数据），按 (路径, 修改时间, 大小) 缓存；失败返回 (None, None)
+        只缓存成功结果，探测失败（如 ffprobe 超时）下次调用会重新读取
+        """
+        try:
+            st = os.stat(video_path)
+        except OSError:
+            return None, None
+        key = (os.path.abspath(video_path), st.st_mtime_ns, st.st_size)
+        cache = CicadaLipSyncNode._dims_cache
+        with CicadaLipSyncNode._dims_lock:
+            dims = cache.get(key)
+            if dims is not None:
+                cache.move_to_end(key)
+                return dims
+
+        dims = CicadaLipSyncNode._probe_video_dimensions(key[0])
+        if dims[0] is not None:
+            with CicadaLipSyncNode._dims_lock:
+                cache[key] = dims
+                cache.move_to_end(key)
+                while len(cache) > CicadaLipSyncNode._DIMS_CACHE_MAX:
+                    cache.popitem(last=False)
+        return dims
+
+    @staticmethod
+    def _ffprobe_rotation(stream):
+        """ffprobe 流信息中的旋转角度：新版 ffmpeg 在 side_data 的 rotation，旧版在 tags.rotate"""
+        for side_data in stream.get("side_data_list") or ():
+            if "rotation" in side_data:
+                return int(float(side_data["rotation"]))
+        rotate = (stream.get("tags") or {}).get("rotate")
+        return int(float(rotate)) if rotate else 0
+
+    @staticmethod
+    def _probe_video_dimensions(video_path):
+        """
+        读取视频显示宽高：优先 ffprobe（只解析容器头），不可用时回退 OpenCV
+        ffprobe 返回的是存储尺寸，旋转 ±90° 时交换宽高（与 OpenCV 默认应用旋转元数据的结果一致），
+        手机竖拍视频常以横向存储并标记旋转
+        """
+        import subprocess
+
+        ffprobe_path = _ffprobe()
+        if ffprobe_path:
+            try:
+                out = subprocess.check_output(
+                    [ffprobe_path, "-v", "error", "-select_streams", "v:0",
+                     "-show_entries", "stream=width,height:stream_side_data=rotation:stream_tags=rotate",
+                     "-of", "json", video_path],
+                    timeout=5,
+                )
+                stream = _json_loads(out)["streams"][0]
+                w, h = int(stream["width"]), int(stream["height"])
+                if CicadaLipSyncNode._ffprobe_rotation(stream) % 180 == 90:
+                    w, h = h, w
+                if w > 0 and h > 0:
+                    return w, h
+            except Exception:
+                pass
+
         if not CV2_AVAILABLE:
             return None, None
         cap = None
@@ -1043,8 +1824,7 @@ class CicadaLipSyncNode:
         # 初始化进度条
         progress = CicadaProgress([
             ("准备", 5),
-            ("上传视频", 15),
-            ("上传音频", 10),
+            ("上传文件", 25),
             ("视频合成", 65),
             ("完成", 5),
         ])
@@ -1075,7 +1855,10 @@ class CicadaLipSyncNode:
         else:
             print(f"✅ 视频尺寸: {w} x {h} (自动检测)")
 
-        # 解析参数
+        # 解析参数（在上传前校验，参数无效时不浪费上传）
+        if model not in self.MODEL_MAP:
+            raise ValueError(f"未知的对口型模型: {model}（可选: {', '.join(self.MODEL_MAP)}）")
+        model_value = self.MODEL_MAP[model]
         backway_value = 2 if backway == "reverse" else 1
         drive_mode_value = "random" if drive_mode == "random" else ""
         print(f"✅ 播放策略: {backway}（{backway_value}）")
@@ -1083,20 +1866,23 @@ class CicadaLipSyncNode:
 
         access_token = get_access_token()
 
-        # ---- 上传视频 ----
-        progress.advance("上传视频")
-        video_result = upload_file(video_path, "lip_sync_video", access_token, progress=progress)
-        progress.update(100, "视频上传完成")
-
-        # ---- 上传音频 ----
-        progress.advance("上传音频")
-        audio_result = upload_file(audio_path, "lip_sync_audio", access_token, progress=progress)
-        progress.update(100, "音频上传完成")
+        # ---- 上传视频 + 音频（两者互不依赖，并行上传） ----
+        progress.advance("上传文件")
+        upload_group = UploadProgressGroup(progress, {
+            "视频": os.path.getsize(video_path),
+            "音频": os.path.getsize(audio_path),
+        })
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            video_future = executor.submit(upload_file, video_path, "lip_sync_video", access_token,
+                                           progress=upload_group.tracker("视频"))
+            audio_future = executor.submit(upload_file, audio_path, "lip_sync_audio", access_token,
+                                           progress=upload_group.tracker("音频"))
+            video_result = video_future.result()
+            audio_result = audio_future.result()
+        progress.update(100, "视频和音频上传完成")
 
         # ---- 视频合成 ----
         progress.advance("视频合成")
-        model_value = 1 if model == "cicada-lip-sync pro" else 0
-
         result = api_json_request(
             "POST",
             f"{BASE_URL}/open/v1/video_lip_sync/create",
@@ -1131,30 +1917,74 @@ class CicadaLipSyncNode:
     @staticmethod
     def _poll_lip_sync(task_id, access_token, progress=None, max_wait=1800):
         """轮询对口型任务状态"""
-        start = time.time()
+        start = time.monotonic()
         last_progress = -1
         last_status = -1
+        idle_attempts = 0  # 状态/进度连续未变化的轮询次数（用于退避）
+
+        wait_s = CicadaLipSyncNode.LONG_POLL_WAIT
+        error_attempts = 0
+
+        # 只记录 HTTP 往返耗时（response.elapsed），不含频率控制等待和 api_request 的重试间隔，
+        # 避免一次慢响应/重试被误判为服务端挂起了请求
+        timing = {"elapsed": 0.0}
+
+        def _record_elapsed(response, *args, **kwargs):
+            timing["elapsed"] = response.elapsed.total_seconds()
 
         print(f"\n⏳ 等待视频合成...")
         while True:
-            if time.time() - start > max_wait:
+            if time.monotonic() - start > max_wait:
                 raise TimeoutError(f"任务超时（{max_wait}秒）")
 
-            result = api_json_request(
-                "GET",
-                f"{BASE_URL}/open/v1/video_lip_sync/detail",
-                rate_category="default",
-                silent_rate=True,
-                params={"id": task_id},
-                headers={"access_token": access_token},
-            )
+            # 未探测或已确认支持时带上 wait 参数尝试长轮询
+            long_poll = CicadaLipSyncNode._long_poll_supported is not False
+            params = {"id": task_id, "wait": wait_s} if long_poll else {"id": task_id}
+            timing["elapsed"] = 0.0
+            try:
+                result = api_json_request(
+                    "GET",
+                    f"{BASE_URL}/open/v1/video_lip_sync/detail",
+                    rate_category="default",
+                    silent_rate=True,
+                    params=params,
+                    headers={"access_token": access_token},
+                    timeout=wait_s + 5 if long_poll else 30,
+                    hooks={"response": _record_elapsed},
+                )
+                error_attempts = 0
+            except Exception:
+                if long_poll and CicadaLipSyncNode._long_poll_supported is None:
+                    # 服务端不接受 wait 参数，回退为普通轮询
+                    CicadaLipSyncNode._long_poll_supported = False
+                    continue
+                if not long_poll:
+                    raise
+                # 长轮询传输错误：退避后重试
+                error_attempts += 1
+                if error_attempts >= 5:
+                    raise
+                time.sleep(adaptive_sleep(error_attempts))
+                continue
+
             data = result.get("data", {})
             status = data.get("status")
             api_progress = data.get("progress", 0)
             msg = data.get("msg", "")
+            changed = status != last_status or api_progress != last_progress
+
+            # 任务未结束时根据响应耗时判断服务端是否真的挂起了请求
+            held = False
+            if long_poll and status in (0, 10):
+                held = timing["elapsed"] >= wait_s / 2
+                if CicadaLipSyncNode._long_poll_supported is None and not changed:
+                    CicadaLipSyncNode._long_poll_supported = held
+                elif CicadaLipSyncNode._long_poll_supported and not changed and not held:
+                    # 无变化却立即返回，说明 wait 参数未生效
+                    CicadaLipSyncNode._long_poll_supported = False
 
             # 状态: 0-排队中, 10-生成中, 20-生成成功, 30-生成失败
-            if status != last_status or api_progress != last_progress:
+            if changed:
                 status_text = {0: "排队中", 10: "生成中", 20: "成功", 30: "失败"}.get(status, f"未知({status})")
                 if progress:
                     # 排队阶段用前15%，生成阶段用API的progress
@@ -1162,12 +1992,14 @@ class CicadaLipSyncNode:
                         progress.update(min(15, api_progress), f"排队中")
                     else:
                         progress.update(api_progress, f"视频合成 {api_progress}%")
-                if status == 0:
-                    print(f"🎬 排队中: {api_progress}%")
-                else:
-                    print(f"🎬 视频合成: {api_progress}% - {status_text}")
+                # 状态切换必打印；同一状态下的进度变化按时间节流
+                line = f"🎬 排队中: {api_progress}%" if status == 0 else f"🎬 视频合成: {api_progress}% - {status_text}"
+                throttled_log("lip_sync", line, min_interval=POLL_LOG_INTERVAL, force=status != last_status)
                 last_status = status
                 last_progress = api_progress
+                idle_attempts = 0
+            else:
+                idle_attempts += 1
 
             if status == 20:
                 video_url = data.get("video_url", "")
@@ -1185,14 +2017,26 @@ class CicadaLipSyncNode:
                 raise Exception(f"视频合成失败: {msg}")
 
             # status 0(排队) 或 10(生成中)，继续轮询
-            time.sleep(5)
+            # 本次响应确实被服务端挂起过，直接发起下一次请求；
+            # 因进度变化而立即返回的响应仍按退避间隔等待，避免生成期间请求过密
+            if CicadaLipSyncNode._long_poll_supported and held:
+                continue
+            # 无变化时逐步拉长间隔；进度 ≥80% 时用最短间隔，尽快发现完成
+            time.sleep(adaptive_sleep(0 if api_progress >= 80 else idle_attempts))
 
 
 # ==================== 声音克隆节点 ====================
 
+# 合成音频可识别的扩展名（从结果 URL 推断本地文件扩展名时使用）
+_AUDIO_EXTS = frozenset({".mp3", ".wav", ".m4a", ".ogg", ".flac"})
+
+
 class CicadaVoiceCloneNode:
     """蝉镜 AI 声音克隆节点 - 克隆声音并合成语音"""
 
+    def __init__(self):
+        warm_up_connection()
+
     @classmethod
     def INPUT_TYPES(cls):
         return {
@@ -1401,12 +2245,19 @@ class CicadaVoiceCloneNode:
 
         # ---- 下载阶段 ----
         progress.advance("下载音频")
-        audio_local_path = self._download_audio(audio_url)
-
-        # 加载为 ComfyUI AUDIO 格式（waveform + sample_rate）
-        waveform, sample_rate = self._load_audio(audio_local_path)
-        # ComfyUI AUDIO 格式: waveform shape = (batch, channels, samples)
-        audio_output = {"waveform": waveform.unsqueeze(0), "sample_rate": sample_rate}
+        audio_local_path = self._audio_local_path(audio_url)
+        audio_bytes = self._download_audio_bytes(audio_url)
+
+        # 解码与落盘互不依赖：工作线程直接从内存解码（不再从磁盘读回），当前线程同时写入输出目录，
+        # 两者重叠执行，解码结果在写盘完成后再等待
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            decode_future = executor.submit(
+                self._load_audio, audio_bytes, ext=os.path.splitext(audio_local_path)[1]
+            )
+            self._persist_bytes(audio_bytes, audio_local_path)
+            waveform, sample_rate = decode_future.result()
+        # ComfyUI AUDIO 格式: waveform shape = (batch, channels, samples)，_load_audio 已按此形状返回
+        audio_output = {"waveform": waveform, "sample_rate": sample_rate}
 
         progress.finish("🎉 任务全部完成！")
         print(f"\n{'='*60}")
@@ -1417,71 +2268,84 @@ class CicadaVoiceCloneNode:
         return (audio_output,)
 
     @staticmethod
-    def _download_audio(audio_url):
-        """下载合成的音频文件到本地，返回本地文件路径（每次重新下载，不使用缓存）"""
+    def _audio_local_path(audio_url):
+        """生成合成音频的本地保存路径（时间戳命名，每次都是新文件）"""
         output_dir = folder_paths.get_output_directory()
         audio_output_dir = os.path.join(output_dir, "cicada_audio")
         os.makedirs(audio_output_dir, exist_ok=True)
 
         # 用时间戳生成唯一文件名，每次都重新下载
         timestamp = int(time.time() * 1000)
-        # 从 URL 推断扩展名，默认 .mp3
-        ext = ".mp3"
-        url_path = audio_url.split("?")[0]
-        for candidate in [".mp3", ".wav", ".m4a", ".ogg", ".flac"]:
-            if url_path.lower().endswith(candidate):
-                ext = candidate
-                break
+        # 从 URL 推断扩展名，不在白名单内时默认 .mp3
+        ext = os.path.splitext(audio_url.split("?")[0])[1].lower()
+        if ext not in _AUDIO_EXTS:
+            ext = ".mp3"
         filename = f"cicada_clone_{timestamp}{ext}"
-        local_path = os.path.join(audio_output_dir, filename)
+        return os.path.join(audio_output_dir, filename)
 
+    @staticmethod
+    def _download_audio_bytes(audio_url):
+        """下载合成的音频到内存，返回 bytes（每次重新下载，不使用缓存）"""
         print(f"⬇️  下载音频: {audio_url}")
         response = api_request("GET", audio_url, rate_category="default", stream=True, timeout=300)
 
-        total = int(response.headers.get('content-length', 0))
-        downloaded = 0
-        last_pct = -20
-
-        with open(local_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=1024 * 1024):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    if total > 0:
-                        pct = int((downloaded / total) * 100)
-                        if pct >= last_pct + 20 or pct >= 100:
-                            print(f"📥 下载: {pct}%")
-                            last_pct = pct
+        buf = io.BytesIO()
+        with response:
+            _copy_response_to_file(response, buf)
+        data = buf.getvalue()
+        print(f"✅ 音频下载完成 ({format_file_size(len(data))})")
+        return data
 
-        size = os.path.getsize(local_path)
-        print(f"✅ 音频下载完成: {filename} ({format_file_size(size)})")
-        return local_path
+    @staticmethod
+    def _persist_bytes(data, local_path):
+        """将音频数据写入本地文件（与解码并行执行，失败只提示不影响主流程）"""
+        try:
+            with open(local_path, 'wb') as f:
+                f.write(data)
+            print(f"💾 音频已保存: {os.path.basename(local_path)}")
+        except Exception as e:
+            print(f"⚠️  保存音频文件失败: {e}")
 
     @staticmethod
-    def _load_audio(file_path):
+    def _load_audio(source, ext=None):
         """
-        加载音频文件为 (waveform, sample_rate)，兼容多种环境。
+        加载音频为 (waveform, sample_rate)，兼容多种环境。
+        source: 文件路径，或内存中的音频数据 bytes（此时 ext 为扩展名，如 ".mp3"，供 torchaudio 识别格式）
         优先 scipy（最常见）→ soundfile → torchaudio（需后端）。
-        返回: (waveform: Tensor[channels, samples], sample_rate: int)
+        返回: (waveform: Tensor[1, channels, samples], sample_rate: int)
+        waveform 直接按 ComfyUI AUDIO 的 (batch, channels, samples) 形状构造且内存连续，调用方无需再 unsqueeze
         """
-        import torch
-        import numpy as np
+        in_memory = isinstance(source, (bytes, bytearray))
+
+        def _open():
+            # 每种方式各自从头读取
+            return io.BytesIO(source) if in_memory else source
 
+        # 后端在各自分支内解析（进程内只导入一次，见 _optional_import），前一种成功时不会导入后面的模块；
+        # 未安装的直接跳过
         # 方法1: scipy（ComfyUI 环境通常自带，仅支持 wav）
         try:
-            from scipy.io import wavfile
-            sr, data = wavfile.read(file_path)
+            wavfile = _scipy_wavfile()
+            if wavfile is None:
+                raise ImportError("未安装 scipy")
+            sr, data = wavfile.read(_open())
             # data shape: (samples,) 单声道 or (samples, channels) 多声道
-            if data.dtype == np.int16:
-                data = data.astype(np.float32) / 32768.0
-            elif data.dtype == np.int32:
-                data = data.astype(np.float32) / 2147483648.0
-            elif data.dtype != np.float32:
-                data = data.astype(np.float32)
-            if data.ndim == 1:
-                data = data[np.newaxis, :]    # (1, samples)
+            if np.issubdtype(data.dtype, np.integer):
+                # 整数 PCM 统一归一化到 [-1, 1)（int16 / int32 / 8-bit 无符号等）
+                # 类型转换与缩放融合为一次 ufunc 运算：只遍历一遍内存、只分配一次
+                info = np.iinfo(data.dtype)
+                if info.min == 0:
+                    half = (float(info.max) + 1.0) / 2.0   # 无符号 PCM 以中点为零
+                    data = np.subtract(data, np.float32(half), dtype=np.float32)
+                    np.multiply(data, np.float32(1.0 / half), out=data)
+                else:
+                    scale = np.float32(1.0 / (float(info.max) + 1.0))
+                    data = np.multiply(data, scale, dtype=np.float32)
             else:
-                data = data.T                  # (channels, samples)
+                # 从内存 BytesIO 读取的 float WAV 是 np.frombuffer 得到的只读视图，
+                # 不可写时复制一份，避免 torch.from_numpy 共享只读内存
+                data = np.require(data, dtype=np.float32, requirements=("C", "W"))
+            data = _to_batched_waveform(data)
             print(f"✅ 音频加载成功（scipy）: {sr}Hz, shape={data.shape}")
             return torch.from_numpy(data), sr
         except Exception as e:
@@ -1489,12 +2353,11 @@ class CicadaVoiceCloneNode:
 
         # 方法2: soundfile（支持 wav/flac/ogg 等）
         try:
-            import soundfile as sf
-            data, sr = sf.read(file_path, dtype='float32')
-            if data.ndim == 1:
-                data = data[np.newaxis, :]
-            else:
-                data = data.T
+            soundfile = _soundfile()
+            if soundfile is None:
+                raise ImportError("未安装 soundfile")
+            data, sr = soundfile.read(_open(), dtype='float32')
+            data = _to_batched_waveform(data)
             print(f"✅ 音频加载成功（soundfile）: {sr}Hz, shape={data.shape}")
             return torch.from_numpy(data), sr
         except Exception as e:
@@ -1502,15 +2365,21 @@ class CicadaVoiceCloneNode:
 
         # 方法3: torchaudio（需要 sox/soundfile/ffmpeg 后端）
         try:
-            import torchaudio
-            waveform, sr = torchaudio.load(file_path)
+            torchaudio = _torchaudio()
+            if torchaudio is None:
+                raise ImportError("未安装 torchaudio")
+            if in_memory and ext:
+                waveform, sr = torchaudio.load(_open(), format=ext.lstrip("."))
+            else:
+                waveform, sr = torchaudio.load(_open())
+            waveform = waveform.unsqueeze(0).contiguous()  # (1, channels, samples)
             print(f"✅ 音频加载成功（torchaudio）: {sr}Hz, shape={tuple(waveform.shape)}")
             return waveform, sr
         except Exception as e:
             print(f"⚠️  torchaudio 加载失败: {e}")
 
         raise Exception(
-            f"❌ 无法加载音频文件: {file_path}\n\n"
+            f"❌ 无法加载音频文件: {'内存音频数据' if in_memory else source}\n\n"
             f"尝试了 scipy / soundfile / torchaudio 均失败。\n"
             f"建议安装: pip install soundfile\n"
             f"或安装系统 ffmpeg: brew install ffmpeg"
@@ -1523,15 +2392,16 @@ class CicadaVoiceCloneNode:
         文档: https://doc.chanjing.cc/api/customised-voice/get-voice-result.html
         状态: 0-等待制作 1-制作中 2-已完成 3-已过期 4-制作失败 99-已删除
         """
-        start = time.time()
+        start = time.monotonic()
         last_status = -1
         last_progress = -1
+        idle_attempts = 0  # 状态/进度连续未变化的轮询次数（用于退避）
         consecutive_errors = 0
         max_consecutive_errors = 5
         print("⏳ 等待声音克隆完成...")
 
         while True:
-            elapsed = time.time() - start
+            elapsed = time.monotonic() - start
             if elapsed > max_wait:
                 raise TimeoutError(
                     f"声音克隆超时（已等待 {int(elapsed)} 秒）\n"
@@ -1588,10 +2458,17 @@ class CicadaVoiceCloneNode:
                 if status != last_status or api_progress != last_progress:
                     if progress:
                         progress.update(api_progress, f"声音克隆 {api_progress}% - {status_text}")
-                    print(f"⏳ 声音克隆: {api_progress}% - {status_text}")
+                    throttled_log(
+                        "voice_clone", f"⏳ 声音克隆: {api_progress}% - {status_text}",
+                        min_interval=POLL_LOG_INTERVAL, force=status != last_status,
+                    )
                     last_status = status
                     last_progress = api_progress
-                time.sleep(5)
+                    idle_attempts = 0
+                else:
+                    idle_attempts += 1
+                # 无变化时逐步拉长间隔；进度 ≥80% 时用最短间隔
+                time.sleep(adaptive_sleep(0 if api_progress >= 80 else idle_attempts))
 
     @staticmethod
     def _poll_audio_synthesis(task_id, access_token, progress=None, max_wait=600):
@@ -1601,14 +2478,14 @@ class CicadaVoiceCloneNode:
         状态: 1-生成中, 9-生成完毕(包含成功与失败，通过 errMsg 区分)
         - 对轮询中的临时性 API 错误做容错处理（连续失败 5 次才放弃）
         """
-        start = time.time()
+        start = time.monotonic()
         poll_count = 0
         consecutive_errors = 0
         max_consecutive_errors = 5
         print("⏳ 等待语音合成完成...")
 
         while True:
-            elapsed = time.time() - start
+            elapsed = time.monotonic() - start
             if elapsed > max_wait:
                 raise TimeoutError(
                     f"语音合成超时（已等待 {int(elapsed)} 秒）\n"
@@ -1690,14 +2567,13 @@ class CicadaVoiceCloneNode:
                 # 只在首次打印，后续靠进度条展示
                 if poll_count == 1:
                     print("⏳ 语音合成中...")
-                # 动态调整轮询间隔：前期 3s，后期延长到 5s 避免频繁请求
-                sleep_time = 3 if poll_count <= 10 else 5
-                time.sleep(sleep_time)
+                # 接口无进度信息，按轮询次数指数退避：前期快速确认完成，后期减少请求
+                time.sleep(adaptive_sleep(poll_count - 1))
             else:
                 # 未知状态，记录日志但继续轮询（兼容未来可能新增的状态码）
                 poll_count += 1
                 print(f"⚠️  语音合成返回未知状态: {status}，继续等待...")
-                time.sleep(5)
+                time.sleep(adaptive_sleep(poll_count - 1))
 
 
 # ==================== 视频播放器节点 ====================
@@ -1719,6 +2595,10 @@ class CicadaVideoPlayerNode:
                     "multiline": False,
                     "tooltip": "Video URL address (can be directly connected from the Cicada AI lip-sync node output)"
                 }),
+                "use_cache": (["disabled", "enabled"], {
+                    "default": "disabled",
+                    "tooltip": "When enabled, a video already downloaded from the same URL is reused (revalidated via ETag when available) instead of being downloaded again"
+                }),
             }
         }
 
@@ -1728,15 +2608,22 @@ class CicadaVideoPlayerNode:
     OUTPUT_NODE = True
 
     @classmethod
-    def IS_CHANGED(cls, video_url):
+    def IS_CHANGED(cls, video_url, use_cache="disabled"):
         return float("nan")
 
-    def load_video(self, video_url):
+    def load_video(self, video_url, use_cache="disabled"):
         try:
             if not video_url or video_url.startswith("❌"):
                 return {"ui": {"text": ["❌ 请提供有效的视频URL"]}}
 
-            # 每次重新下载，不使用缓存，用时间戳生成唯一文件名
+            if use_cache == "enabled":
+                # 按 URL 复用已下载的视频（缓存文件由 download_with_cache 自行保证完整，出错时不清理）
+                print(f"⬇️  下载视频（缓存开启）: {video_url}")
+                cached_path, hit = download_with_cache(video_url, self.cache_dir, ".mp4")
+                print(f"{'✅ 命中下载缓存' if hit else '✅ 视频下载完成'}: {cached_path}")
+                return self._ui_result(os.path.basename(cached_path))
+
+            # 未开启缓存：每次重新下载，用时间戳生成唯一文件名
             timestamp = int(time.time() * 1000)
             filename = f"cicada_{timestamp}.mp4"
             output_path = os.path.join(self.cache_dir, filename)
@@ -1744,33 +2631,12 @@ class CicadaVideoPlayerNode:
             print(f"⬇️  下载视频: {video_url}")
             response = api_request("GET", video_url, rate_category="default", stream=True, timeout=300)
 
-            total = int(response.headers.get('content-length', 0))
-            downloaded = 0
-            last_pct = -20
-
-            with open(output_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=1024 * 1024):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if total > 0:
-                            pct = int((downloaded / total) * 100)
-                            if pct >= last_pct + 20 or pct >= 100:
-                                print(f"📥 下载: {pct}%")
-                                last_pct = pct
+            with response, open(output_path, 'wb') as f:
+                _copy_response_to_file(response, f)
 
             print(f"✅ 视频下载完成: {output_path}")
 
-            return {
-                "ui": {
-                    "gifs": [{
-                        "filename": filename,
-                        "subfolder": "cicada_videos",
-                        "type": "output",
-                        "format": "video/mp4"
-                    }]
-                }
-            }
+            return self._ui_result(filename)
         except Exception as e:
             error_msg = f"❌ 错误: {str(e)}"
             print(f"\n{error_msg}\n")
@@ -1782,6 +2648,20 @@ class CicadaVideoPlayerNode:
                     pass
             return {"ui": {"text": [error_msg]}}
 
+    @staticmethod
+    def _ui_result(filename):
+        """输出目录 cicada_videos 下视频文件的前端预览结果"""
+        return {
+            "ui": {
+                "gifs": [{
+                    "filename": filename,
+                    "subfolder": "cicada_videos",
+                    "type": "output",
+                    "format": "video/mp4"
+                }]
+            }
+        }
+
 
 # ==================== 节点注册 ====================
 